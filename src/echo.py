@@ -1,26 +1,30 @@
 import espnow
 import machine
 
+_DONE = b"!done"  # Message to stop the server
+_RESET = b"!reset"  # Message to reset the device
+
 enow = espnow.ESPNow()
 
 def server():
-    peers = []
+    peers = set()
+    send, add_peer = enow.send, enow.add_peer
     for peer, msg in enow:
         if peer is None:
             return
         if peer not in peers:
-            peers.append(peer)
+            peers.add(peer)
             try:
-                enow.add_peer(peer)
+                add_peer(peer)
             except OSError:
                 pass
 
         #  Echo the MAC and message back to the sender
-        if not enow.send(peer, msg):
+        if not send(peer, msg):
             print("ERROR: send() failed to", peer)
             return
 
-        if msg == b"!done":
+        if msg == _DONE:
             return
-        elif msg == b"!reset":
+        elif msg == _RESET:
             machine.reset()
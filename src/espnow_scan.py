@@ -1,5 +1,6 @@
 import sys
 import time
+import errno
 import network
 import espnow
 
@@ -8,11 +9,19 @@ NUM_PINGS = 10  # The default number of pings to send on each channel
 PING_MSG = b"ping"  # The message to send in each packet to the peer
 CHANNEL_SETTLING_TIME = 0.0  # Delay after setting channel before testing (seconds)
 MIN_PING_RESPONSE_PC = 10  # Minimum acceptable ping response rate (percent)
+RECV_TIMEOUT_MS = 50  # Time to wait for replies to a broadcast ping (ms)
+BROADCAST = b"\xff" * 6  # The espnow broadcast MAC address
+# Scan the non-overlapping "social" channels (1, 6, 11) first, then the rest
+SCAN_ORDER = (1, 6, 11) + tuple(
+    c for c in range(1, MAX_CHANNEL + 1) if c not in (1, 6, 11))
+
+_peer_channel_cache = {}  # The channel each peer was last found on
+_enow = None  # The ESPNow instance shared by all scans (see _get_enow())
 
 sta, ap = (network.WLAN(i) for i in (network.STA_IF, network.AP_IF))
 
 
-def set_channel(channel):
+def set_channel(channel, verify=False):
     if sta.isconnected():
         raise OSError("can not set channel when connected to wifi network.")
     if ap.isconnected():
@@ -24,14 +33,23 @@ def set_channel(channel):
             if channel < 12:
                 print(f"Error setting channel: {err}")
             return None
-        return sta.config("channel")
+        return sta.config("channel") if verify else channel
     else:
         # On ESP8266, use the AP interface to set the channel of the STA interface
         ap_save = ap.active()
         ap.active(True)
         ap.config(channel=channel)
         ap.active(ap_save)
-        return ap.config("channel")
+        return ap.config("channel") if verify else channel
+
+
+# Return the shared ESPNow instance, making sure it is active.
+def _get_enow():
+    global _enow
+    if _enow is None:
+        _enow = espnow.ESPNow()
+    _enow.active(True)  # Other users of the ESPNow singleton may deactivate it
+    return _enow
 
 
 # Return the fraction of pings to peer which succeed.
@@ -40,12 +58,63 @@ def ping_peer(enow, peer, channel, num_pings, verbose):
         return 0.0
     time.sleep(CHANNEL_SETTLING_TIME)
     msg = PING_MSG + bytes([channel])
-    frac = sum((enow.send(peer, msg) for _ in range(num_pings))) / num_pings
+    send, ok = enow.send, 0
+    for _ in range(num_pings):
+        try:
+            if send(peer, msg):
+                ok += 1
+        except OSError as err:
+            if err.args[0] != errno.ETIMEDOUT:
+                raise
+            # A send timeout counts as a failed ping
+    frac = ok / num_pings
     if verbose:
         print(f"Channel {channel:2d}: ping response rate = {frac * 100:3.0f}%.")
     return frac
 
 
+# Return True once a run of responding channels has been fully located, ie. it
+# is bounded on both sides by scanned silent channels (or the edge of the band).
+def _found_run(ping_fracs):
+    hit = (MIN_PING_RESPONSE_PC + 5) / 100
+    n, i = len(ping_fracs), 0
+    while i < n:
+        if ping_fracs[i] is None or ping_fracs[i] < hit:
+            i += 1
+            continue
+        j = i
+        while j < n and ping_fracs[j] is not None and ping_fracs[j] >= hit:
+            j += 1
+        if (i == 0 or ping_fracs[i - 1] is not None) and (
+            j == n or ping_fracs[j] is not None
+        ):
+            return True
+        i = j
+    return False
+
+
+# Return the list of channels within 5% of the max ping success rate (or [] if
+# none are above the minimum response rate) and the max ping success rate.
+def _best_channels(ping_fracs):
+    ping_fracs = [frac or 0.0 for frac in ping_fracs]
+    max_frac = max(ping_fracs)
+    if max_frac < (MIN_PING_RESPONSE_PC + 5) / 100:
+        return [], max_frac
+    found = [chan + 1 for chan, rate in enumerate(ping_fracs) if rate >= max_frac - 0.05]
+    return found, max_frac
+
+
+# Return the peer channel from the sorted list of channels it was found on.
+def _select_channel(found):
+    # Because of channel cross-talk we may get more than one channel to be found
+    # If 3 channels found, select the middle one
+    # If 2 channels found: select first one if it is channel 1 else second
+    # If 1 channels found, select it
+    count = len(found)
+    index = (count // 2) if not (count == 2 and found[0] == 1) else 0
+    return found[index]
+
+
 def scan(peer, num_pings=NUM_PINGS, verbose=False):
     """Scan the wifi channels to find the given espnow peer device.
 
@@ -66,31 +135,120 @@ def scan(peer, num_pings=NUM_PINGS, verbose=False):
     """
     if not sta.active() and not ap.active():
         sta.active(True)  # One of the WLAN interfaces must be active
-    enow = espnow.ESPNow()
-    enow.active(True)
+    enow = _get_enow()
     try:
         enow.add_peer(peer)  # If user has not already registered peer
     except OSError:
         pass
 
     # A list of the ping success rates (fraction) for each channel
-    ping_fracs = [
-        ping_peer(enow, peer, channel, num_pings, verbose)
-        for channel in range(1, MAX_CHANNEL + 1)
-    ]
-    max_frac = max(ping_fracs)
-    if max_frac < (MIN_PING_RESPONSE_PC + 5) / 100:
+    ping_fracs = [None] * MAX_CHANNEL  # None for channels not yet scanned
+
+    # Check the channel the peer was last found on before scanning. Its
+    # neighbours are checked too, so cross-talk can not keep a stale entry.
+    cached = _peer_channel_cache.pop(bytes(peer), None)
+    if cached:
+        for channel in range(max(cached - 1, 1), min(cached + 1, MAX_CHANNEL) + 1):
+            ping_fracs[channel - 1] = ping_peer(enow, peer, channel, num_pings, verbose)
+    found, max_frac = _best_channels(ping_fracs)
+    if not found or _select_channel(found) != cached:
+        for channel in SCAN_ORDER:
+            if ping_fracs[channel - 1] is not None:
+                continue  # Already checked above
+            ping_fracs[channel - 1] = ping_peer(enow, peer, channel, num_pings, verbose)
+            if _found_run(ping_fracs):
+                break
+        found, max_frac = _best_channels(ping_fracs)
+    if not found:
         print(f"No channel found with response rate above {MIN_PING_RESPONSE_PC}%")
         return 0
-    # Get a list of channel numbers within 5% of max ping success rate
-    found = [chan + 1 for chan, rate in enumerate(ping_fracs) if rate >= max_frac - 0.05]
 
-    # Because of channel cross-talk we may get more than one channel to be found
-    # If 3 channels found, select the middle one
-    # If 2 channels found: select first one if it is channel 1 else second
-    # If 1 channels found, select it
-    count = len(found)
-    index = (count // 2) if not (count == 2 and found[0] == 1) else 0
-    channel = found[index]
+    channel = _select_channel(found)
     print(f"Setting wifi radio to channel {channel} ({max_frac * 100:3.0f}% response)")
-    return set_channel(channel)
+    _peer_channel_cache[bytes(peer)] = channel
+    return set_channel(channel, verify=True)
+
+
+# Return a ping_fracs list for _found_run() from the channels a peer responded
+# on and the channels which have been scanned.
+def _hit_fracs(channels, scanned):
+    return [
+        1.0 if chan in channels else 0.0 if chan in scanned else None
+        for chan in range(1, MAX_CHANNEL + 1)
+    ]
+
+
+def scan_peers(peers, timeout_ms=RECV_TIMEOUT_MS, verbose=False):
+    """Scan the wifi channels to find several espnow peer devices at once.
+
+    A single broadcast ping is sent on each channel and every peer which
+    echoes it back (eg. running echo.server()) is recorded, so all the peers
+    are found in one pass over the channels. As with scan(), channel
+    cross-talk is resolved by selecting the middle of the channels a peer
+    responded on.
+    Will:
+        - scan using the STA_IF;
+        - stop once the channels each peer responded on are bounded by
+          silent channels (or the edge of the band);
+        - restore the wifi channel which was set on entry.
+
+    Args:
+        peers (list): The MAC addresses (bytes) of the peer devices to find.
+        timeout_ms (int, optional):
+            Time to wait for replies on each channel. (default=50).
+        verbose (bool): Print the channel of each peer found.
+
+    Returns:
+        dict: The channel number of each peer found, keyed by MAC address.
+    """
+    wanted = set(bytes(peer) for peer in peers)
+    if not wanted:
+        return {}
+    if not sta.active() and not ap.active():
+        sta.active(True)  # One of the WLAN interfaces must be active
+    enow = _get_enow()
+    try:
+        enow.add_peer(BROADCAST)
+    except OSError:
+        pass
+
+    saved_channel = ap.config("channel")
+    scanned = set()  # The channels a broadcast ping was sent on
+    hits = {}  # The channels each peer responded on
+    try:
+        for channel in SCAN_ORDER:
+            if set_channel(channel) is None:
+                continue
+            time.sleep(CHANNEL_SETTLING_TIME)
+            try:
+                enow.send(BROADCAST, PING_MSG + bytes([channel]))
+            except OSError as err:
+                if err.args[0] != errno.ETIMEDOUT:
+                    raise
+                continue  # Leave this channel unscanned
+            scanned.add(channel)
+            while True:
+                mac, msg = enow.recv(timeout_ms)
+                if mac is None:
+                    break
+                mac = bytes(mac)
+                if (mac not in wanted or len(msg) <= len(PING_MSG)
+                        or not msg.startswith(PING_MSG)):
+                    continue
+                # The echoed ping says which channel it was sent on, so late
+                # replies to the previous channel are not misattributed.
+                hits.setdefault(mac, set()).add(msg[len(PING_MSG)])
+            if len(hits) == len(wanted) and all(
+                _found_run(_hit_fracs(channels, scanned)) for channels in hits.values()
+            ):
+                break
+    finally:
+        set_channel(saved_channel)
+
+    found = {}
+    for mac, channels in hits.items():
+        found[mac] = _peer_channel_cache[mac] = _select_channel(sorted(channels))
+        if verbose:
+            print(f"Found peer {mac} on channel {found[mac]}.")
+    return found
+
@@ -2,9 +2,13 @@
 # MIT license; Copyright (c) 2022 Glenn Moloney @glenn20
 
 import time
+import errno
 import network
 import espnow
 
+# Channel 0 (current channel) first, then the "social" channels (1, 6, 11)
+_SCAN_ORDER = (0, 1, 6, 11, 2, 3, 4, 5, 7, 8, 9, 10, 12, 13)
+
 
 def _handle_esperror(self, err, peer):
     if len(err.args) < 2:
@@ -77,6 +81,7 @@ class LazyESPNow(espnow.ESPNow):
     default_if = network.STA_IF
     debug = None
     _saved_peers = {}
+    _peer_channels = {}  # The channel each peer was last found on
     wlans = [network.WLAN(i) for i in [network.STA_IF, network.AP_IF]]
 
     def __init__(self, default_if=network.STA_IF):
@@ -119,18 +124,50 @@ class LazyESPNow(espnow.ESPNow):
     def add_peer(self, mac, *args, **kwargs):
         return super().add_peer(mac, *args, **kwargs)
 
-    def find_peer(self, mac, msg, lmk=None, ifidx=-1, encrypt=None):
+    def find_peer(self, mac, msg, lmk=None, ifidx=-1, encrypt=None, retries=3):
         try:
             _ = super().get_peer(mac)
         except OSError:
             self.add_peer(
                 mac, lmk, 0, ifidx,
                 encrypt if encrypt is not None else bool(lmk))
-        for num_tries in (0, 10):
-            for chan in range(14):
-                super().mod_peer(mac, channel=chan)
-                for _ in range(num_tries):
-                    if super().send(mac, msg):
-                        return True
-                    time.sleep(0.10)
+        # Try the channel the peer was last found on before scanning
+        chan = self._peer_channels.get(bytes(mac))
+        if chan is not None:
+            if self._ping_channel(mac, msg, chan, retries):
+                return True
+            del self._peer_channels[bytes(mac)]
+        # First pass: a single probe on each channel. A send() which times out
+        # (ETIMEDOUT) is inconclusive, so retry those channels afterwards.
+        retry = []
+        for chan in _SCAN_ORDER:
+            found = self._ping_channel(mac, msg, chan, 1)
+            if found:
+                return self._found_peer(mac, chan)
+            if found is None:
+                retry.append(chan)
+        for chan in retry:
+            if self._ping_channel(mac, msg, chan, retries):
+                return self._found_peer(mac, chan)
         return False
+
+    # Return True if peer responds on chan, None if send() timed out, else False.
+    def _ping_channel(self, mac, msg, chan, tries):
+        super().mod_peer(mac, channel=chan)
+        send, result = super().send, False
+        for i in range(tries):
+            if i:
+                time.sleep(0.10)
+            try:
+                if send(mac, msg):
+                    return True
+            except OSError as err:
+                if err.args[0] != errno.ETIMEDOUT:
+                    raise
+                result = None
+        return result
+
+    def _found_peer(self, mac, chan):
+        if chan:  # Channel 0 is just "the current channel"
+            self._peer_channels[bytes(mac)] = chan
+        return True
@@ -15,9 +15,11 @@
 #     sta, ap = wifi.reset(False, False)   # STA off, AP off, channel=1
 #     sta, ap = wifi.reset(ap=True)        # STA on, AP on, channel=1
 #     sta, ap = wifi.reset(channel=11)     # STA on, AP off, channel=11
+#     sta, ap = wifi.reset(force=True)     # Turn radio off before reset
 
 #     # Set/get the channel
 #     wifi.channel(11)
+#     wifi.channel(11, verify=True)       # Return channel read back from radio
 #     print(wifi.channel())
 
 #     # Connect/disconnect from a wifi network
@@ -64,31 +66,45 @@ except AttributeError:
     default_protocol = None
 
 
-def channel(channel=0):
-    if channel == 0:
-        return _ap.config("channel")
+def _check_can_set_channel():
     if _sta.isconnected():
         raise OSError("can not set channel when connected to wifi network.")
     if _ap.isconnected():
         raise OSError("can not set channel when clients are connected to AP.")
-    if _sta.active() and not is_esp8266:
-        _sta.config(channel=channel)  # On ESP32 use STA interface
-        return _sta.config("channel")
-    else:
-        # On ESP8266, use the AP interface to set the channel
-        ap_save = _ap.active()
-        _ap.active(True)
-        _ap.config(channel=channel)
-        _ap.active(ap_save)
+
+
+def _channel_ap(channel=0, verify=False):
+    if channel == 0:
         return _ap.config("channel")
+    _check_can_set_channel()
+    # Use the AP interface to set the channel (always on ESP8266)
+    ap_save = _ap.active()
+    _ap.active(True)
+    _ap.config(channel=channel)
+    _ap.active(ap_save)
+    return _ap.config("channel") if verify else channel
+
+
+def _channel_esp32(channel=0, verify=False):
+    if channel == 0 or not _sta.active():
+        return _channel_ap(channel, verify)  # Fall back to AP interface
+    _check_can_set_channel()
+    _sta.config(channel=channel)  # On ESP32 use STA interface
+    return _sta.config("channel") if verify else channel
+
+
+# Select the implementation for this platform once, at import (this saves the
+# is_esp8266 test, the ESP32 version still checks the STA interface per call)
+channel = _channel_ap if is_esp8266 else _channel_esp32
 
 
 def wait_for(fun, timeout=timeout):
-    start = time.time()
+    start, delay = time.ticks_ms(), 5
     while not fun():
-        if time.time() - start > timeout:
+        if time.ticks_diff(time.ticks_ms(), start) > timeout * 1000:
             raise TimeoutError()
-        time.sleep(0.1)
+        time.sleep_ms(delay)
+        delay = min(delay * 2, 100)  # Poll quickly at first, backing off
 
 
 def disconnect():
@@ -111,21 +127,28 @@ def reset(
     channel=default_channel,
     pm=default_pm_mode,
     protocol=default_protocol,
+    force=False,
 ):
     "Reset wifi to STA_IF on, AP_IF off, channel=1 and disconnected"
-    _sta.active(False)  # Force into known state by turning off radio
-    _ap.active(False)
-    _sta.active(sta)  # Now set to requested state
-    _ap.active(ap)
+    if force:
+        _sta.active(False)  # Force into known state by turning off radio
+        _ap.active(False)
+    elif _ap.isconnected():
+        _ap.active(False)  # Drop connected clients so the channel can be set
+    if _sta.active() != bool(sta):
+        _sta.active(sta)  # Now set to requested state
+    if _ap.active() != bool(ap):
+        _ap.active(ap)
     if sta:
         disconnect()  # For ESP8266
         try:
-            _sta.config(pm=pm)
+            if _sta.config("pm") != pm:  # Only reconfigure if changed
+                _sta.config(pm=pm)
         except (ValueError):
             pass
     try:
         wlan = _sta if sta else _ap if ap else None
-        if wlan and (protocol is not None):
+        if wlan and (protocol is not None) and wlan.config("protocol") != protocol:
             wlan.config(protocol=protocol)
     except (ValueError, RuntimeError):
         pass
@@ -134,14 +157,13 @@ def reset(
 
 
 def status():
-    from binascii import hexlify
-
     for name, w in (("STA", _sta), ("AP", _ap)):
         active = "on," if w.active() else "off,"
         mac = w.config("mac")
-        hex = hexlify(mac, ":").decode()
+        hex = mac.hex(":")
         print("{:3s}: {:4s} mac= {} ({})".format(name, active, hex, mac))
-    if _sta.isconnected():
+    connected = _sta.isconnected()
+    if connected:
         print("     connected:", _sta.config("ssid"), end="")
     else:
         print("     disconnected", end="")
@@ -168,5 +190,5 @@ def status():
     except ValueError:
         pass
     print()
-    if _sta.isconnected():
+    if connected:
         print("     ifconfig:", _sta.ifconfig())